@@ -21,7 +21,8 @@ This script:
 
 from __future__ import annotations
 
-import platform
+import functools
+import io
 import shutil
 import subprocess
 import sys
@@ -33,68 +34,122 @@ app = typer.Typer(help="Developer utilities for this project.")
 
 JUST_COMMAND: Final[str] = "just"
 
+_OUTPUT_CHUNK_SIZE: Final[int] = 65536
+
+_MANUAL_INSTRUCTIONS: Final[str] = "\n".join(
+    [
+        "",
+        "Manual installation instructions for `just`:",
+        "",
+        "Linux (Debian/Ubuntu):",
+        "  sudo apt install just",
+        "or (any Linux):",
+        "  curl -s https://just.systems/install.sh | bash",
+        "",
+        "macOS (Homebrew):",
+        "  brew install just",
+        "",
+        "Windows (Scoop):",
+        "  scoop install just",
+        "Windows (Chocolatey):",
+        "  choco install just",
+        "",
+        "Rust (any OS, with cargo):",
+        "  cargo install just",
+        "",
+        "Releases (manual binary):",
+        "  https://github.com/casey/just/releases",
+        "",
+    ]
+)
+
+# File extensions the Windows builds of these tools ship with.
+_WINDOWS_SUFFIXES: Final[dict[str, str]] = {
+    JUST_COMMAND: ".exe",
+    "scoop": ".cmd",
+    "choco": ".exe",
+}
+
+_PLATFORM_NAMES: Final[dict[str, str]] = {
+    "linux": "linux",
+    "darwin": "macos",
+    "win32": "windows",
+}
+
 
 def _run_command(command: list[str]) -> int:
-    """Run a command and return its exit code."""
-    process = subprocess.run(command, check=False)
+    """
+    Run a command and return its exit code.
+
+    On a terminal the child inherits stdout/stderr so progress output and
+    colors work as usual. Otherwise (CI logs, pipes) its combined output is
+    copied through in chunks of up to 64 KiB as it arrives, rather than
+    line by line.
+    """
+    if sys.stdout.isatty():
+        completed = subprocess.run(command, check=False)
+        return completed.returncode
+
+    sys.stdout.flush()
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=_OUTPUT_CHUNK_SIZE,
+    ) as process:
+        stream = process.stdout
+        # bufsize > 0 gives a BufferedReader, whose read1() returns what has arrived.
+        assert isinstance(stream, io.BufferedReader)
+        for chunk in iter(lambda: stream.read1(_OUTPUT_CHUNK_SIZE), b""):
+            sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
     return process.returncode
 
 
+def _which_fast(command: str) -> str | None:
+    """
+    Locate `command` on PATH.
+
+    On Windows, commands listed in `_WINDOWS_SUFFIXES` are looked up by
+    their known file name only, which avoids the full PATHEXT search. A
+    miss there is final; other commands use plain `shutil.which`.
+    """
+    if _platform_name() == "windows" and command in _WINDOWS_SUFFIXES:
+        return shutil.which(command + _WINDOWS_SUFFIXES[command])
+    return shutil.which(command)
+
+
+@functools.cache
+def _which(command: str) -> str | None:
+    """Return the resolved path of `command` on PATH, cached per process."""
+    return _which_fast(command)
+
+
+@functools.cache
 def _is_just_installed() -> bool:
     """Return True if `just` is available on PATH."""
-    return shutil.which(JUST_COMMAND) is not None
+    return _which_fast(JUST_COMMAND) is not None
 
 
+@functools.cache
 def _platform_name() -> str:
     """Return a simplified platform name."""
-    system = platform.system().lower()
-    if system.startswith("linux"):
-        return "linux"
-    if system == "darwin":
-        return "macos"
-    if system == "windows":
-        return "windows"
-    return "unknown"
+    return _PLATFORM_NAMES.get(sys.platform, "unknown")
 
 
 def _print_manual_instructions() -> None:
     """Print manual installation instructions for `just`."""
-    typer.echo()
-    typer.echo("Manual installation instructions for `just`:\n")
-
-    typer.echo("Linux (Debian/Ubuntu):")
-    typer.echo("  sudo apt install just")
-    typer.echo("or (any Linux):")
-    typer.echo("  curl -s https://just.systems/install.sh | bash")
-    typer.echo()
-
-    typer.echo("macOS (Homebrew):")
-    typer.echo("  brew install just")
-    typer.echo()
-
-    typer.echo("Windows (Scoop):")
-    typer.echo("  scoop install just")
-    typer.echo("Windows (Chocolatey):")
-    typer.echo("  choco install just")
-    typer.echo()
-
-    typer.echo("Rust (any OS, with cargo):")
-    typer.echo("  cargo install just")
-    typer.echo()
-
-    typer.echo("Releases (manual binary):")
-    typer.echo("  https://github.com/casey/just/releases")
-    typer.echo()
+    typer.echo(_MANUAL_INSTRUCTIONS)
 
 
 def _auto_install_linux() -> bool:
     """Try to install `just` on Linux, return True on success."""
-    if shutil.which("apt"):
+    if _which("apt"):
         return _run_command(["sudo", "apt", "update"]) == 0 and _run_command(
             ["sudo", "apt", "install", "-y", "just"],
         ) == 0
 
-    if shutil.which("curl"):
+    if _which("curl"):
         return (
             _run_command(["bash", "-c", "curl -s https://just.systems/install.sh | bash"])
             == 0
@@ -105,17 +160,17 @@ def _auto_install_linux() -> bool:
 
 def _auto_install_macos() -> bool:
     """Try to install `just` on macOS, return True on success."""
-    if shutil.which("brew"):
+    if _which("brew"):
         return _run_command(["brew", "install", "just"]) == 0
     return False
 
 
 def _auto_install_windows() -> bool:
     """Try to install `just` on Windows, return True on success."""
-    if shutil.which("scoop"):
+    if _which("scoop"):
         return _run_command(["scoop", "install", "just"]) == 0
 
-    if shutil.which("choco"):
+    if _which("choco"):
         return _run_command(["choco", "install", "just", "-y"]) == 0
 
     return False
@@ -192,6 +247,9 @@ def install_just(
 
     typer.echo("Attempting automatic installation of `just`...")
     success = _attempt_auto_install()
+    if success:
+        # PATH may have changed underneath us; force a fresh lookup.
+        _is_just_installed.cache_clear()
 
     if success and _is_just_installed():
         typer.secho(
@@ -18,29 +18,34 @@ def parse_kv(pairs):
 
 def main():
     parser = argparse.ArgumentParser(description="Create .env file from key=value pairs.")
-    parser.add_argument("--github-pat", dest="github_pat", help="GitHub Personal Access Token.")(description="Create .env file from key=value pairs.")
+    parser.add_argument("--github-pat", dest="github_pat", help="GitHub Personal Access Token.")
     parser.add_argument("--out", default=".env", help="Output env file path.")
     parser.add_argument("pairs", nargs="+", help="KEY=VALUE entries.")
     args = parser.parse_args()
 
     kvs = parse_kv(args.pairs)
     if args.github_pat:
-        kvs.append(("GITHUB_PERSONAL_ACCESS_TOKEN", args.github_pat))(args.pairs)
+        kvs.append(("GITHUB_PERSONAL_ACCESS_TOKEN", args.github_pat))
     out = Path(args.out)
 
-    lines = [f"{k}={v}" for k, v in kvs]
-    out.write_text("".join(lines) + "", encoding="utf-8")
-    ensure_gitignore(out)("\n".join(lines) + "\n", encoding="utf-8")
+    payload = "\n".join(f"{k}={v}" for k, v in kvs) + "\n"
+    out.write_text(payload, encoding="utf-8")
+    ensure_gitignore(out)
 
 def ensure_gitignore(out_path: Path) -> None:
     gi = Path('.gitignore')
     if not gi.exists():
         return
-    content = gi.read_text().splitlines()
     rel = str(out_path)
-    if rel not in content:
-        content.append(rel)
-        gi.write_text("".join(content) + "")
+    last = ""
+    with gi.open("r", encoding="utf-8", buffering=65536) as f:
+        for line in f:
+            if line.rstrip("\r\n") == rel:
+                return
+            last = line
+    prefix = "" if not last or last.endswith("\n") else "\n"
+    with open(gi, "a", encoding="utf-8", buffering=8192) as f:
+        f.write(prefix + rel + "\n")
 
 
 if __name__ == "__main__":
@@ -5,17 +5,44 @@
 3. Verifies Docker is installed and usable.
 4. If Docker is missing, offers best-effort installation
    using platform-appropriate tools (choco / apt / brew).
-5. Runs: docker compose pull
+5. Runs: docker compose pull (only for images not pulled in the last
+   24 hours, tracked in .docker-pull-cache.json)
 6. Runs: docker compose up
 """
 
 import argparse
-import getpass
+import functools
+import json
+import os
 import platform
 import shutil
 import subprocess
 import sys
+import time
+from collections.abc import Callable
 from pathlib import Path
+from typing import Final
+
+_SYSTEM: Final[str] = platform.system()
+
+# File extensions the Windows builds of these tools ship with.
+_WINDOWS_SUFFIXES: Final[dict[str, str]] = {"docker": ".exe", "choco": ".exe"}
+
+PULL_CACHE_PATH: Final[Path] = Path(".docker-pull-cache.json")
+PULL_CACHE_MAX_AGE: Final[float] = 24 * 60 * 60
+
+
+def _which_fast(cmd: str) -> str | None:
+    # On Windows, look up known tools by their shipped file name only; this
+    # skips the PATHEXT search, and a miss is final. Others use shutil.which.
+    if _SYSTEM == "Windows" and cmd in _WINDOWS_SUFFIXES:
+        return shutil.which(cmd + _WINDOWS_SUFFIXES[cmd])
+    return shutil.which(cmd)
+
+
+@functools.cache
+def _docker_present() -> bool:
+    return _which_fast("docker") is not None
 
 
 def r_ensure_gitignore_entry(path: Path) -> None:
@@ -23,27 +50,65 @@ def r_ensure_gitignore_entry(path: Path) -> None:
     if not gitignore.exists():
         return
     rel = path.as_posix()
-    lines = gitignore.read_text(encoding="utf-8").splitlines()
-    if rel in lines:
-        return
-    lines.append(rel)
-    gitignore.write_text("".join(lines) + "", encoding="utf-8")
+    last = ""
+    with gitignore.open("r", encoding="utf-8", buffering=65536) as f:
+        for line in f:
+            if line.rstrip("\r\n") == rel:
+                return
+            last = line
+    prefix = "" if not last or last.endswith("\n") else "\n"
+    with open(gitignore, "a", encoding="utf-8", buffering=8192) as f:
+        f.write(prefix + rel + "\n")
+
+
+def r_write_env_file(env_path: Path, lines: list[str]) -> None:
+    env_text = "\n".join(lines) + "\n" if lines else ""
+    env_path.write_text(env_text, encoding="utf-8")
+    r_ensure_gitignore_entry(env_path)
+    messages = [f"Wrote env file to: {env_path}"]
+    if not lines:
+        messages.append("Warning: env file is currently empty.")
+    print("\n".join(messages))
 
 
 def r_prompt_new_env(env_path: Path) -> None:
     print(f"{env_path} does not exist.")
+    if not sys.stdin.isatty():
+        # Piped / CI input: drain stdin in one read and keep KEY=VALUE lines.
+        entries = [line.strip() for line in sys.stdin.read().splitlines()]
+        entries = [entry for entry in entries if entry]
+        lines: list[str] = [entry for entry in entries if "=" in entry]
+        skipped = len(entries) - len(lines)
+        if skipped:
+            # Do not echo the skipped lines: one of them may be a bare token.
+            print(
+                f"Note: skipped {skipped} piped line(s) not in KEY=VALUE format "
+                "(pass the token as GITHUB_PERSONAL_ACCESS_TOKEN=...).",
+                file=sys.stderr,
+            )
+        if not lines:
+            print("Aborting: env file is required.")
+            sys.exit(1)
+        r_write_env_file(env_path, lines)
+        return
     answer = input("Create a new env file now? [y/N]: ").strip().lower()
     if answer not in ("y", "yes"):
         print("Aborting: env file is required.")
         sys.exit(1)
+    import getpass
+
     print(
-        "You can leave any value blank if you do not want to set it."
-        "Values are written to the env file in KEY=VALUE format."
+        "\n".join(
+            [
+                "You can leave any value blank if you do not want to set it.",
+                "Values are written to the env file in KEY=VALUE format.",
+            ]
+        )
     )
     github_pat = getpass.getpass(
         "GITHUB_PERSONAL_ACCESS_TOKEN (hidden, optional): "
     ).strip()
-    lines: list[str] = []
+    lines = []
     if github_pat:
         lines.append(f"GITHUB_PERSONAL_ACCESS_TOKEN={github_pat}")
     print(
@@ -58,23 +123,43 @@ def r_prompt_new_env(env_path: Path) -> None:
             print("Invalid format, expected KEY=VALUE. Try again.")
             continue
         lines.append(raw)
-    env_text = "".join(lines) + "" if lines else ""
-    env_path.write_text(env_text, encoding="utf-8")
+    r_write_env_file(env_path, lines)
+
+
+def r_ensure_env_gitignored(env_path: Path) -> None:
+    # A zero-byte sentinel at least as new as .gitignore means the entry was
+    # already verified, so only two stat calls are needed on later runs.
+    sentinel = env_path.with_name(env_path.name + ".gitignored")
+    try:
+        gitignore_mtime = os.stat(".gitignore").st_mtime_ns
+    except FileNotFoundError:
+        return
+    try:
+        if os.stat(sentinel).st_mtime_ns >= gitignore_mtime:
+            return
+    except OSError:
+        pass
     r_ensure_gitignore_entry(env_path)
-    print(f"Wrote env file to: {env_path}")
-    if not lines:
-        print("Warning: env file is currently empty.")
+    r_ensure_gitignore_entry(sentinel)
+    try:
+        sentinel.touch()
+    except OSError:
+        # e.g. a read-only env directory: skip caching, the check still ran.
+        pass
 
 
 def r_ensure_env_file(env_path: Path) -> None:
-    if env_path.exists():
-        r_ensure_gitignore_entry(env_path)
+    if os.path.lexists(env_path) and not os.path.isfile(env_path):
+        print(f"Error: env file path is not a regular file: {env_path}")
+        sys.exit(1)
+    if os.path.isfile(env_path):
+        r_ensure_env_gitignored(env_path)
         return
     r_prompt_new_env(env_path)
 
 
 def r_run_command(cmd: list[str]) -> None:
-    print(f"+ {' '.join(cmd)}")
+    print(f"+ {' '.join(cmd)}", flush=True)
     try:
         subprocess.run(cmd, check=True)
     except FileNotFoundError:
@@ -85,11 +170,24 @@ def r_run_command(cmd: list[str]) -> None:
         sys.exit(exc.returncode)
 
 
+def r_exec_command(cmd: list[str]) -> None:
+    if _SYSTEM == "Windows":
+        # os.exec* on Windows spawns a child and exits, detaching the console.
+        r_run_command(cmd)
+        return
+    print(f"+ {' '.join(cmd)}", flush=True)
+    try:
+        os.execvp(cmd[0], cmd)
+    except FileNotFoundError:
+        print(f"Error: command not found: {cmd[0]}")
+        sys.exit(1)
+
+
 def r_try_install_docker_windows() -> None:
-    if shutil.which("docker"):
+    if _docker_present():
         return
     print("Docker not found. Attempting Windows install via choco (if available)...")
-    if not shutil.which("choco"):
+    if not _which_fast("choco"):
         print(
             "Chocolatey is not installed. Please install Docker Desktop manually "
             "from https://docs.docker.com/desktop/windows/install/ and re-run."
@@ -105,17 +203,17 @@ def r_try_install_docker_windows() -> None:
         "-Verb",
         "runAs",
     ]
-    print("Requesting elevated install of Docker Desktop via Chocolatey...")
+    print("Requesting elevated install of Docker Desktop via Chocolatey...", flush=True)
     subprocess.run(ps_cmd, check=False)
     print("Please complete Docker Desktop installation, then re-run this script.")
     sys.exit(1)
 
 
 def r_try_install_docker_linux() -> None:
-    if shutil.which("docker"):
+    if _docker_present():
         return
     print("Docker not found. Attempting Linux install via apt (if available)...")
-    if not shutil.which("apt"):
+    if not _which_fast("apt"):
         print(
             "apt not found. Please install Docker using your distro's package "
             "manager: https://docs.docker.com/engine/install/"
@@ -139,10 +237,10 @@ def r_try_install_docker_linux() -> None:
 
 
 def r_try_install_docker_macos() -> None:
-    if shutil.which("docker"):
+    if _docker_present():
         return
     print("Docker not found. Attempting macOS install via Homebrew (if available)...")
-    if not shutil.which("brew"):
+    if not _which_fast("brew"):
         print(
             "Homebrew is not installed. Please install Docker Desktop from "
             "https://docs.docker.com/desktop/mac/install/ and re-run."
@@ -156,36 +254,165 @@ def r_try_install_docker_macos() -> None:
     sys.exit(1)
 
 
+_DOCKER_INSTALLER: Final[Callable[[], None] | None] = {
+    "Windows": r_try_install_docker_windows,
+    "Linux": r_try_install_docker_linux,
+    "Darwin": r_try_install_docker_macos,
+}.get(_SYSTEM)
+
+
 def r_ensure_docker_available() -> None:
-    if shutil.which("docker"):
+    if _docker_present():
         return
-    system = platform.system()
-    if system == "Windows":
-        r_try_install_docker_windows()
-    elif system == "Linux":
-        r_try_install_docker_linux()
-    elif system == "Darwin":
-        r_try_install_docker_macos()
-    else:
+    if _DOCKER_INSTALLER is None:
         print(
-            f"Unsupported OS for auto-install: {system}. Please install Docker "
+            f"Unsupported OS for auto-install: {_SYSTEM}. Please install Docker "
             "manually from https://docs.docker.com/get-docker/."
         )
         sys.exit(1)
+    _DOCKER_INSTALLER()
+    # Installers that return (rather than exit) must have put docker on PATH.
+    _docker_present.cache_clear()
+    if not _docker_present():
+        print(
+            "Docker is still not on PATH after installation. Please open a "
+            "new shell or install Docker manually and re-run."
+        )
+        sys.exit(1)
+
+
+def r_start_compose_config(base_cmd: tuple[str, ...]) -> subprocess.Popen[str]:
+    # 'config' validates the compose file and resolves each service's image.
+    config_cmd = list(base_cmd + ("config", "--format", "json"))
+    print(f"+ {' '.join(config_cmd)}", flush=True)
+    try:
+        return subprocess.Popen(config_cmd, stdout=subprocess.PIPE, text=True)
+    except FileNotFoundError:
+        print(f"Error: command not found: {config_cmd[0]}")
+        sys.exit(1)
+
+
+def r_compose_images(config_proc: subprocess.Popen[str]) -> dict[str, str]:
+    stdout, _ = config_proc.communicate()
+    if config_proc.returncode != 0:
+        print(f"Error: command failed with code {config_proc.returncode}")
+        sys.exit(config_proc.returncode)
+    services = json.loads(stdout).get("services", {})
+    return {
+        name: service["image"]
+        for name, service in services.items()
+        if service.get("image")
+    }
+
+
+def r_image_key(ref: str) -> str:
+    # Normalize a reference to the form `docker image inspect` reports in
+    # RepoTags / RepoDigests ("nginx" -> "nginx:latest", no docker.io prefix).
+    name, at, digest = ref.partition("@")
+    if not at and ":" not in name.rsplit("/", 1)[-1]:
+        name += ":latest"
+    for prefix in ("docker.io/library/", "docker.io/"):
+        if name.startswith(prefix):
+            name = name[len(prefix) :]
+            break
+    return name + at + digest
+
+
+def r_local_image_ids(images: list[str]) -> dict[str, str]:
+    # One `docker image inspect` for every reference; images missing locally
+    # are left out of the result (docker still prints the ones it found).
+    refs = sorted(set(images))
+    if not refs:
+        return {}
+    proc = subprocess.run(
+        ["docker", "image", "inspect", *refs],
+        check=False,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        found = json.loads(proc.stdout or "[]")
+    except ValueError:
+        return {}
+    ids = {}
+    for info in found:
+        for tag in (info.get("RepoTags") or []) + (info.get("RepoDigests") or []):
+            ids[r_image_key(tag)] = info["Id"]
+    return {ref: ids[r_image_key(ref)] for ref in refs if r_image_key(ref) in ids}
+
+
+def r_load_pull_cache() -> dict[str, dict]:
+    try:
+        cache = json.loads(PULL_CACHE_PATH.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    return {image: entry for image, entry in cache.items() if isinstance(entry, dict)}
+
+
+def r_unexpired_images(cache: dict[str, dict]) -> list[str]:
+    now = time.time()
+    return [
+        image
+        for image, entry in cache.items()
+        if now - entry.get("pulled_at", 0) <= PULL_CACHE_MAX_AGE
+    ]
+
+
+def r_stale_services(
+    images: dict[str, str], cache: dict[str, dict], local_ids: dict[str, str]
+) -> list[str]:
+    # A service needs pulling if its image was never pulled by this script,
+    # was pulled too long ago, or no longer matches the local image ID
+    # (`local_ids`, from one batched inspect of the unexpired cache entries).
+    now = time.time()
+    stale = []
+    for service, image in images.items():
+        entry = cache.get(image)
+        if (
+            not entry
+            or now - entry.get("pulled_at", 0) > PULL_CACHE_MAX_AGE
+            or entry.get("id") != local_ids.get(image)
+        ):
+            stale.append(service)
+    return stale
+
+
+def r_record_pulls(
+    images: dict[str, str], services: list[str], cache: dict[str, dict]
+) -> None:
+    now = time.time()
+    local_ids = r_local_image_ids([images[service] for service in services])
+    for image, image_id in local_ids.items():
+        cache[image] = {"id": image_id, "pulled_at": now}
+    PULL_CACHE_PATH.write_text(json.dumps(cache, indent=2) + "\n", encoding="utf-8")
+    r_ensure_gitignore_entry(PULL_CACHE_PATH)
 
 
 def r_run_docker_compose(compose_file: Path, env_file: Path, pull: bool) -> None:
-    base_cmd = [
+    base_cmd: tuple[str, ...] = (
         "docker",
         "compose",
         "--file",
         str(compose_file),
         "--env-file",
         str(env_file),
-    ]
+    )
     if pull:
-        r_run_command(base_cmd + ["pull"])
-    r_run_command(base_cmd + ["up"])
+        # Validate the compose file while the cached images are inspected.
+        config_proc = r_start_compose_config(base_cmd)
+        cache = r_load_pull_cache()
+        local_ids = r_local_image_ids(r_unexpired_images(cache))
+        images = r_compose_images(config_proc)
+        stale = r_stale_services(images, cache, local_ids)
+        if stale:
+            r_run_command(list(base_cmd + ("pull", *stale)))
+            r_record_pulls(images, stale, cache)
+        else:
+            print("All images were pulled recently; skipping 'docker compose pull'.")
+    r_exec_command(list(base_cmd + ("up",)))
 
 
 def r_parse_runner_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -214,11 +441,11 @@ def r_parse_runner_args(argv: list[str] | None = None) -> argparse.Namespace:
 
 def r_main(argv: list[str] | None = None) -> None:
     args = r_parse_runner_args(argv)
+    if not os.path.isfile(args.compose_file):
+        print(f"Error: compose file not found: {args.compose_file}")
+        sys.exit(1)
     env_path = Path(args.env_file)
     compose_path = Path(args.compose_file)
-    if not compose_path.exists():
-        print(f"Error: compose file not found: {compose_path}")
-        sys.exit(1)
     r_ensure_env_file(env_path)
     r_ensure_docker_available()
     do_pull = not args.no_pull
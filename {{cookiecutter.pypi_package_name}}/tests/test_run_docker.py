@@ -0,0 +1,213 @@
+"""Tests for `scripts/run_docker.py`."""
+
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "run_docker.py"
+
+
+@pytest.fixture
+def run_docker():
+    """Load `scripts/run_docker.py` as a module (it is not part of the package)."""
+    spec = importlib.util.spec_from_file_location("run_docker", SCRIPT)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_stale_services_missing_entry(run_docker):
+    local_ids = {"web:latest": "sha256:a"}
+    assert run_docker.r_stale_services({"web": "web:latest"}, {}, local_ids) == ["web"]
+
+
+def test_stale_services_expired_entry(run_docker):
+    local_ids = {"web:latest": "sha256:a"}
+    pulled_at = time.time() - run_docker.PULL_CACHE_MAX_AGE - 60
+    cache = {"web:latest": {"id": "sha256:a", "pulled_at": pulled_at}}
+    assert run_docker.r_stale_services({"web": "web:latest"}, cache, local_ids) == ["web"]
+    assert run_docker.r_unexpired_images(cache) == []
+
+
+def test_stale_services_id_mismatch(run_docker):
+    local_ids = {"web:latest": "sha256:b"}
+    cache = {"web:latest": {"id": "sha256:a", "pulled_at": time.time()}}
+    assert run_docker.r_stale_services({"web": "web:latest"}, cache, local_ids) == ["web"]
+
+
+def test_stale_services_image_removed_locally(run_docker):
+    cache = {"web:latest": {"id": "sha256:a", "pulled_at": time.time()}}
+    assert run_docker.r_stale_services({"web": "web:latest"}, cache, {}) == ["web"]
+
+
+def test_stale_services_fresh_entry(run_docker):
+    local_ids = {"web:latest": "sha256:a", "db:16": "sha256:c"}
+    now = time.time()
+    cache = {
+        "web:latest": {"id": "sha256:a", "pulled_at": now},
+        "db:16": {"id": "sha256:old", "pulled_at": now},
+    }
+    images = {"web": "web:latest", "db": "db:16"}
+    assert run_docker.r_stale_services(images, cache, local_ids) == ["db"]
+
+
+@pytest.mark.parametrize("content", ["[1, 2]", '"text"', "not json", '{"web:latest": []}'])
+def test_load_pull_cache_rejects_malformed(run_docker, monkeypatch, tmp_path, content):
+    cache_path = tmp_path / "cache.json"
+    cache_path.write_text(content, encoding="utf-8")
+    monkeypatch.setattr(run_docker, "PULL_CACHE_PATH", cache_path)
+    assert run_docker.r_load_pull_cache() == {}
+
+
+def test_load_pull_cache_roundtrip(run_docker, monkeypatch, tmp_path):
+    cache = {"web:latest": {"id": "sha256:a", "pulled_at": 1.0}}
+    cache_path = tmp_path / "cache.json"
+    cache_path.write_text(json.dumps(cache), encoding="utf-8")
+    monkeypatch.setattr(run_docker, "PULL_CACHE_PATH", cache_path)
+    assert run_docker.r_load_pull_cache() == cache
+
+
+@pytest.fixture
+def piped_stdin(monkeypatch):
+    """Replace stdin with a non-TTY stream holding the given text."""
+
+    def pipe(text):
+        monkeypatch.setattr("sys.stdin", io.StringIO(text))
+
+    return pipe
+
+
+def test_prompt_new_env_piped_writes_entries(run_docker, piped_stdin, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    piped_stdin("FOO=1\n\nBAR=two words\n")
+    run_docker.r_prompt_new_env(Path(".env"))
+    assert Path(".env").read_text(encoding="utf-8") == "FOO=1\nBAR=two words\n"
+
+
+def test_prompt_new_env_piped_empty_aborts(run_docker, piped_stdin, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    piped_stdin("")
+    with pytest.raises(SystemExit) as excinfo:
+        run_docker.r_prompt_new_env(Path(".env"))
+    assert excinfo.value.code == 1
+    assert not Path(".env").exists()
+
+
+def test_prompt_new_env_piped_reports_skipped_lines(run_docker, piped_stdin, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    piped_stdin("y\nghp_secret\nFOO=1\n\n")
+    run_docker.r_prompt_new_env(Path(".env"))
+    assert Path(".env").read_text(encoding="utf-8") == "FOO=1\n"
+    err = capsys.readouterr().err
+    assert "skipped 2 piped line(s)" in err
+    assert "ghp_secret" not in err
+
+
+def test_which_fast_windows_probes_known_name_once(run_docker, monkeypatch):
+    calls = []
+    monkeypatch.setattr(run_docker, "_SYSTEM", "Windows")
+    monkeypatch.setattr(run_docker.shutil, "which", lambda cmd: calls.append(cmd))
+    assert run_docker._which_fast("docker") is None
+    assert run_docker._which_fast("apt") is None
+    assert calls == ["docker.exe", "apt"]
+
+
+@pytest.fixture
+def env_tree(tmp_path, monkeypatch):
+    """An existing, already-gitignored env file in a temporary working dir."""
+    monkeypatch.chdir(tmp_path)
+    Path(".gitignore").write_text("app.env\n", encoding="utf-8")
+    Path("app.env").write_text("FOO=1\n", encoding="utf-8")
+    return Path("app.env")
+
+
+def test_ensure_env_file_sentinel_hit_skips_gitignore(run_docker, env_tree, monkeypatch):
+    Path("app.env.gitignored").touch()
+    os.utime(".gitignore", ns=(1, 1))
+
+    def fail(path):
+        raise AssertionError(".gitignore should not be scanned")
+
+    monkeypatch.setattr(run_docker, "r_ensure_gitignore_entry", fail)
+    run_docker.r_ensure_env_file(env_tree)
+
+
+def test_ensure_env_file_sentinel_miss_checks_and_touches(run_docker, env_tree):
+    sentinel = Path("app.env.gitignored")
+    sentinel.touch()
+    os.utime(sentinel, ns=(1, 1))
+    run_docker.r_ensure_env_file(env_tree)
+    assert Path(".gitignore").read_text(encoding="utf-8") == "app.env\napp.env.gitignored\n"
+    assert sentinel.stat().st_size == 0
+    assert sentinel.stat().st_mtime_ns >= os.stat(".gitignore").st_mtime_ns
+
+
+def test_ensure_env_file_read_only_dir_skips_caching(run_docker, env_tree, monkeypatch):
+    def deny(self, *args, **kwargs):
+        raise PermissionError(13, "Permission denied", str(self))
+
+    monkeypatch.setattr(Path, "touch", deny)
+    run_docker.r_ensure_env_file(env_tree)
+    assert not Path("app.env.gitignored").exists()
+
+
+@pytest.fixture
+def fake_docker(run_docker, monkeypatch, tmp_path):
+    """Stub `subprocess.run` / `Popen` and the final exec with a recording fake `docker`."""
+    monkeypatch.chdir(tmp_path)
+    docker = SimpleNamespace(calls=[], services={"web": {"image": "nginx"}}, local_ids={})
+
+    def fake_run(cmd, **kwargs):
+        docker.calls.append(cmd)
+        stdout = ""
+        if "config" in cmd:
+            stdout = json.dumps({"services": docker.services})
+        elif cmd[1:3] == ["image", "inspect"]:
+            found = [ref for ref in cmd[3:] if ref in docker.local_ids]
+            stdout = json.dumps([{"Id": docker.local_ids[ref], "RepoTags": [ref + ":latest"]} for ref in found])
+        return subprocess.CompletedProcess(cmd, 0, stdout=stdout)
+
+    class FakePopen:
+        def __init__(self, cmd, **kwargs):
+            self.result = fake_run(cmd, **kwargs)
+            self.returncode = self.result.returncode
+
+        def communicate(self):
+            return self.result.stdout, None
+
+    monkeypatch.setattr(run_docker.subprocess, "run", fake_run)
+    monkeypatch.setattr(run_docker.subprocess, "Popen", FakePopen)
+    monkeypatch.setattr(run_docker, "r_exec_command", docker.calls.append)
+    return docker
+
+
+def test_run_docker_compose_pulls_uncached_images(run_docker, fake_docker):
+    fake_docker.local_ids["nginx"] = "sha256:a"
+    run_docker.r_run_docker_compose(Path("compose.yml"), Path(".env"), pull=True)
+    verbs = [cmd[6:] if cmd[1] == "compose" else cmd[1:3] for cmd in fake_docker.calls]
+    assert verbs == [["config", "--format", "json"], ["pull", "web"], ["image", "inspect"], ["up"]]
+    assert run_docker.r_load_pull_cache()["nginx"]["id"] == "sha256:a"
+
+
+def test_run_docker_compose_skips_pull_when_fresh(run_docker, fake_docker):
+    fake_docker.local_ids["nginx"] = "sha256:a"
+    cache = {"nginx": {"id": "sha256:a", "pulled_at": time.time()}}
+    Path(".docker-pull-cache.json").write_text(json.dumps(cache), encoding="utf-8")
+    run_docker.r_run_docker_compose(Path("compose.yml"), Path(".env"), pull=True)
+    verbs = [cmd[6:] if cmd[1] == "compose" else cmd[1:3] for cmd in fake_docker.calls]
+    assert verbs == [["config", "--format", "json"], ["image", "inspect"], ["up"]]
+
+
+def test_local_image_ids_maps_by_repo_tags(run_docker, fake_docker):
+    fake_docker.local_ids["nginx"] = "sha256:a"
+    ids = run_docker.r_local_image_ids(["nginx", "docker.io/library/nginx:latest", "missing:1"])
+    assert ids == {"nginx": "sha256:a", "docker.io/library/nginx:latest": "sha256:a"}
+    assert len(fake_docker.calls) == 1